@@ -1,36 +1,235 @@
 import streamlit as st
 import sqlite3
+import re
+import threading
 import pandas as pd
-import plotly.express as px  # For perfect bars
 from datetime import date, datetime, timedelta
-from dateutil.relativedelta import relativedelta
 
-# Initialize the database (persists on Streamlit Cloud)
+# Meal types are stored as integers
+MEAL_NAMES = {0: 'Breakfast', 1: 'Lunch', 2: 'Dinner', 3: 'Other'}
+MEAL_TYPES = {name: meal_type for meal_type, name in MEAL_NAMES.items()}
+
+# One-time migration from the old free-text schema (meal = 'Breakfast' / 'Morning' / 'Other: snack' ...)
+# to (meal_type, description). Old rows that land on the same (date, meal_type) -- e.g. 'Morning' + 'Breakfast',
+# or 'Tea' + 'Other: snack' -- are merged: amounts summed (totals stay as before) and notes joined with ', '
+def migrate_meal_types(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(expenses)")]
+    if 'meal' not in columns:
+        return
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")  # DDL doesn't open a transaction implicitly
+        conn.execute('''
+            CREATE TABLE expenses_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date DATE NOT NULL,
+                meal_type INTEGER NOT NULL CHECK(meal_type IN (0, 1, 2, 3)),
+                description TEXT,
+                amount REAL NOT NULL
+            )
+        ''')
+        conn.execute("CREATE UNIQUE INDEX idx_date_type ON expenses_new(date, meal_type)")  # keeps its name after the rename
+        conn.execute('''
+            INSERT INTO expenses_new (id, date, meal_type, description, amount)
+            SELECT id, date, meal_type,
+                   -- Note: text after 'Other: ', or the whole name for free text like 'Tea'
+                   CASE
+                       WHEN meal_type = 3 AND meal LIKE 'Other: %' THEN substr(meal, 8)
+                       WHEN meal_type = 3 AND meal NOT LIKE 'Other%' THEN meal
+                   END,
+                   amount
+            FROM (
+                SELECT *,
+                       CASE
+                           WHEN meal LIKE 'Other%' THEN 3
+                           WHEN meal LIKE '%breakfast%' OR meal LIKE '%morning%' THEN 0
+                           WHEN meal LIKE '%lunch%' OR meal LIKE '%afternoon%' THEN 1
+                           WHEN meal LIKE '%dinner%' OR meal LIKE '%evening%' THEN 2
+                           ELSE 3
+                       END AS meal_type
+                FROM expenses
+            )
+            WHERE true ORDER BY id
+            ON CONFLICT(date, meal_type) DO UPDATE SET
+                amount = expenses_new.amount + excluded.amount,
+                description = COALESCE(expenses_new.description || ', ' || excluded.description,
+                                       expenses_new.description, excluded.description)
+        ''')
+        conn.execute("DROP TABLE expenses")
+        conn.execute("ALTER TABLE expenses_new RENAME TO expenses")
+
+# Shared database connection (persists on Streamlit Cloud), opened once per process
 @st.cache_resource
-def init_db():
-    conn = sqlite3.connect('food_expenses.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date DATE NOT NULL,
-            meal TEXT NOT NULL,
-            amount REAL NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+def get_conn():
+    # IMMEDIATE: 'with conn:' write blocks take SQLite's write lock up front (BEGIN IMMEDIATE) against other processes;
+    # sessions in this process share the connection, so their writes also go through get_write_lock()
+    conn = sqlite3.connect('food_expenses.db', check_same_thread=False, isolation_level="IMMEDIATE")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+    migrate_meal_types(conn)
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date DATE NOT NULL,
+                meal_type INTEGER NOT NULL CHECK(meal_type IN (0, 1, 2, 3)),  -- see MEAL_NAMES
+                description TEXT,  -- optional note (Other only)
+                amount REAL NOT NULL
+            )
+        ''')
+        # One row per (date, meal type); the index also serves date-only lookups and the monthly BETWEEN range
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_date_type ON expenses(date, meal_type)")
+    return conn
 
-init_db()
+get_conn()
 
-st.set_page_config(page_title="Food Tracker", page_icon="🍽️", layout="wide")  # Mobile-optimized layout
+# Serializes writes (and VACUUM) across sessions: each session runs on its own thread but they share the
+# one connection above, so without it one session's statements could join another's open transaction
+@st.cache_resource
+def get_write_lock():
+    return threading.Lock()
 
-# Fun, colorful header
-st.markdown("""
+# Write counter, bumped on every write so the cached reads below refetch.
+# Process-wide like st.cache_data itself, so every session sees the same version
+@st.cache_resource
+def get_db_state():
+    return {"version": 0}
+
+def current_db_version():
+    return get_db_state()["version"]
+
+def bump_db_version():
+    get_db_state()["version"] += 1
+
+# Shared statements (same SQL text -> sqlite3 reuses the prepared statement from its cache)
+DELETE_MEAL_SQL = "DELETE FROM expenses WHERE date = ? AND meal_type = ?"
+DELETE_DAY_SQL = "DELETE FROM expenses WHERE date = ?"
+DELETE_ALL_SQL = "DELETE FROM expenses"
+
+# VACUUM rewrites the whole file, so only run it when >10% of pages are free.
+# Best-effort: reads on the shared connection don't take the write lock, so an in-flight
+# query can make it fail ("SQL statements in progress"); the space is reclaimed next time
+def vacuum_if_fragmented(conn):
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    if total_pages and free_pages / total_pages > 0.10:
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.OperationalError:
+            pass
+
+# Day as {meal name: (label, amount)} from a single query (cached until the next write)
+# Label is the meal name, or 'Other: desc' when a note was given
+@st.cache_data(show_spinner=False, max_entries=31)  # Bounded: each write leaves the old (date, version) keys dead
+def load_day(selected_date, db_version):
+    # At most 4 rows: a plain cursor is cheaper than building a DataFrame
+    rows = get_conn().execute(
+        "SELECT meal_type, description, amount FROM expenses WHERE date = ?", (selected_date,)
+    ).fetchall()
+    day = {}
+    for meal_type, desc, amount in rows:
+        name = MEAL_NAMES[meal_type]
+        day[name] = (f"{name}: {desc}" if desc else name, amount)
+    return day
+
+# Month summary as (daily totals, totals by meal type, monthly total), cached per month until the next write
+@st.cache_data(show_spinner=False, max_entries=12)
+def monthly_summary(month_start, db_version):
+    from dateutil.relativedelta import relativedelta  # Only needed here
+    month_end = month_start + relativedelta(months=1) - timedelta(days=1)
+    df_month = pd.read_sql_query(
+        "SELECT date, meal_type, SUM(amount) AS total FROM expenses "
+        "WHERE date BETWEEN ? AND ? GROUP BY date, meal_type ORDER BY date",
+        get_conn(), params=(month_start, month_end)
+    )
+    
+    # Daily totals (dates stay datetime64; formatted at display time)
+    df_month['date'] = pd.to_datetime(df_month['date'])
+    daily_totals = df_month.groupby('date')['total'].sum().reset_index()
+    daily_totals.columns = ['Date', 'Total']
+    
+    # Meal breakdown, sorted by total descending for better view
+    meal_breakdown = df_month.groupby('meal_type')['total'].sum().reset_index()
+    meal_breakdown['meal_type'] = meal_breakdown['meal_type'].map(MEAL_NAMES)
+    meal_breakdown.columns = ['Meal', 'Total']
+    meal_breakdown = meal_breakdown.sort_values('Total', ascending=False).reset_index(drop=True)
+    
+    return daily_totals, meal_breakdown, float(df_month['total'].sum())
+
+# Function to get existing amount for a meal from the day already loaded by load_day()
+def get_existing_amount(day, meal_name):
+    entry = day.get(meal_name)
+    return entry[1] if entry else None
+
+# Function to delete entry for a meal
+def delete_entry(selected_date, meal_name):
+    conn = get_conn()
+    with get_write_lock():
+        with conn:
+            conn.execute(DELETE_MEAL_SQL, (selected_date, MEAL_TYPES[meal_name]))
+        bump_db_version()
+
+# Function to save or update entry (desc is only kept for Other)
+def save_entry(selected_date, meal_name, amount, desc=""):
+    conn = get_conn()
+    meal_type = MEAL_TYPES[meal_name]
+    with get_write_lock():
+        with conn:
+            if amount > 0:
+                # Insert or update in a single statement
+                conn.execute(
+                    "INSERT INTO expenses (date, meal_type, description, amount) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(date, meal_type) DO UPDATE SET description = excluded.description, amount = excluded.amount",
+                    (selected_date, meal_type, (desc or None) if meal_name == "Other" else None, amount)
+                )
+            else:
+                conn.execute(DELETE_MEAL_SQL, (selected_date, meal_type))
+        bump_db_version()
+
+# Plain decimal amounts (50, 50.5, .5); checked before float() so invalid input never raises
+_NUM_RE = re.compile(r'^\s*(?:\d+(?:\.\d*)?|\.\d+)\s*$')
+
+# Parse a typed amount: blank -> 0.0, invalid -> None
+def parse_amount(text):
+    if _NUM_RE.match(text):
+        return float(text)
+    return 0.0 if text.strip() == "" else None
+
+# Button callbacks: they run before the rerun the click triggers, so the page redraws once with fresh data
+def save_entry_cb(selected_date, meal_name, input_key, desc_key=None):
+    amount = parse_amount(st.session_state[input_key]) or 0.0
+    desc = st.session_state[desc_key] if desc_key else ""
+    save_entry(selected_date, meal_name, amount, desc)
+
+def clear_day_cb(selected_date):
+    conn = get_conn()
+    with get_write_lock():
+        with conn:
+            conn.execute(DELETE_DAY_SQL, (selected_date,))
+        bump_db_version()
+
+def clear_all_cb():
+    conn = get_conn()
+    with get_write_lock():
+        with conn:
+            conn.execute(DELETE_ALL_SQL)
+        bump_db_version()  # The delete is committed; bump before VACUUM so caches refresh even if it fails
+        vacuum_if_fragmented(conn)
+
+# Header CSS, built once
+@st.cache_data
+def get_css():
+    return """
     <style>
     .main-header {color: #FF6B6B; font-size: 3rem; text-align: center; font-weight: bold;}
     </style>
-""", unsafe_allow_html=True)
+"""
+
+st.set_page_config(page_title="Food Tracker", page_icon="🍽️", layout="wide")  # Mobile-optimized layout
+
+# Fun, colorful header
+st.markdown(get_css(), unsafe_allow_html=True)
 st.markdown('<h1 class="main-header">🍽️ Food Expenses Tracker</h1>', unsafe_allow_html=True)
 st.markdown("---")
 
@@ -43,59 +242,8 @@ if page == "Daily Entry":
     # Date selection (compact for mobile)
     selected_date = st.date_input("📅 Select Date", value=date.today(), key="date_mobile")
     
-    # Function to get existing amount for a meal (handles Other with desc, backward compat for old names)
-    def get_existing_amount(meal_name):
-        conn = sqlite3.connect('food_expenses.db')
-        if meal_name == "Other":
-            query = "SELECT amount FROM expenses WHERE date = ? AND (meal LIKE 'Other%' OR meal = 'Other') ORDER BY id DESC LIMIT 1"
-            df = pd.read_sql_query(query, conn, params=(selected_date,))
-        else:
-            # Backward compat: Check old names too (e.g., 'Morning' -> 'Breakfast')
-            old_names = {'Morning': 'Breakfast', 'Afternoon': 'Lunch', 'Evening': 'Dinner'}
-            query = "SELECT amount FROM expenses WHERE date = ? AND meal = ?"
-            df = pd.read_sql_query(query, conn, params=(selected_date, meal_name))
-            if df.empty and meal_name in old_names:
-                df = pd.read_sql_query(query, conn, params=(selected_date, old_names[meal_name]))
-        conn.close()
-        return df['amount'].iloc[0] if not df.empty else None
-    
-    # Function to delete entry for a meal (handles Other with desc, backward compat)
-    def delete_entry(meal_name):
-        conn = sqlite3.connect('food_expenses.db')
-        if meal_name == "Other":
-            conn.execute("DELETE FROM expenses WHERE date = ? AND (meal LIKE 'Other%' OR meal = 'Other')", (selected_date,))
-        else:
-            old_names = {'Morning': 'Breakfast', 'Afternoon': 'Lunch', 'Evening': 'Dinner'}
-            if meal_name in old_names:
-                meal_name = old_names[meal_name]
-            conn.execute("DELETE FROM expenses WHERE date = ? AND meal = ?", (selected_date, meal_name))
-        conn.commit()
-        conn.close()
-        st.rerun()
-    
-    # Function to save or update entry (uses new names)
-    def save_entry(meal_name, amount, desc=""):
-        conn = sqlite3.connect('food_expenses.db')
-        # Delete if exists (new or old name)
-        if meal_name == "Other":
-            conn.execute("DELETE FROM expenses WHERE date = ? AND (meal LIKE 'Other%' OR meal = 'Other')", (selected_date,))
-        else:
-            old_names = {'Breakfast': 'Morning', 'Lunch': 'Afternoon', 'Dinner': 'Evening'}
-            if meal_name in old_names.values():
-                for k, v in old_names.items():
-                    if v == meal_name:
-                        meal_name = k
-                        break
-            conn.execute("DELETE FROM expenses WHERE date = ? AND meal = ?", (selected_date, meal_name))
-        if amount > 0:
-            full_meal = f"{meal_name}: {desc}" if desc and meal_name == "Other" else meal_name
-            conn.execute(
-                "INSERT INTO expenses (date, meal, amount) VALUES (?, ?, ?)",
-                (selected_date, full_meal, amount)
-            )
-        conn.commit()
-        conn.close()
-        st.rerun()
+    # One (cached) query for the whole page
+    day = load_day(selected_date, current_db_version())
     
     # Mobile-friendly inputs with delete logic (New names: Breakfast, Lunch, Dinner, Other)
     st.subheader("💰 Enter Amounts (₹)")
@@ -103,108 +251,78 @@ if page == "Daily Entry":
     
     with col1:
         st.markdown("### 🍳 Breakfast")
-        breakfast_amt = get_existing_amount("Breakfast")
+        breakfast_amt = get_existing_amount(day, "Breakfast")
         if breakfast_amt is not None:
             col_m, col_del_m = st.columns([3, 1])
             with col_m:
                 st.info(f"₹{breakfast_amt:.2f}")
             with col_del_m:
-                if st.button("🗑️ Delete", key="del_breakfast"):
-                    delete_entry("Breakfast")
+                st.button("🗑️ Delete", key="del_breakfast", on_click=delete_entry, args=(selected_date, "Breakfast"))
         else:
-            breakfast_input = st.text_input("", placeholder="e.g., 50.00", key="breakfast_mobile")
-            try:
-                parsed_breakfast = float(breakfast_input) if breakfast_input.strip() != "" else 0.0
-            except ValueError:
-                parsed_breakfast = 0.0
-                if breakfast_input.strip() != "":
+            # Form: typing doesn't rerun the script, only Save does
+            with st.form(key="form_breakfast"):
+                breakfast_input = st.text_input("", placeholder="e.g., 50.00", key="breakfast_mobile")
+                if parse_amount(breakfast_input) is None:
                     st.error("Enter a valid number (e.g., 50.00)")
-            if st.button("💾 Save Breakfast", key="save_breakfast"):
-                save_entry("Breakfast", parsed_breakfast)
+                st.form_submit_button("💾 Save Breakfast", key="save_breakfast", on_click=save_entry_cb, args=(selected_date, "Breakfast", "breakfast_mobile"))
     
     with col2:
         st.markdown("### 🥗 Lunch")
-        lunch_amt = get_existing_amount("Lunch")
+        lunch_amt = get_existing_amount(day, "Lunch")
         if lunch_amt is not None:
             col_a, col_del_a = st.columns([3, 1])
             with col_a:
                 st.info(f"₹{lunch_amt:.2f}")
             with col_del_a:
-                if st.button("🗑️ Delete", key="del_lunch"):
-                    delete_entry("Lunch")
+                st.button("🗑️ Delete", key="del_lunch", on_click=delete_entry, args=(selected_date, "Lunch"))
         else:
-            lunch_input = st.text_input("", placeholder="e.g., 80.00", key="lunch_mobile")
-            try:
-                parsed_lunch = float(lunch_input) if lunch_input.strip() != "" else 0.0
-            except ValueError:
-                parsed_lunch = 0.0
-                if lunch_input.strip() != "":
+            with st.form(key="form_lunch"):
+                lunch_input = st.text_input("", placeholder="e.g., 80.00", key="lunch_mobile")
+                if parse_amount(lunch_input) is None:
                     st.error("Enter a valid number (e.g., 80.00)")
-            if st.button("💾 Save Lunch", key="save_lunch"):
-                save_entry("Lunch", parsed_lunch)
+                st.form_submit_button("💾 Save Lunch", key="save_lunch", on_click=save_entry_cb, args=(selected_date, "Lunch", "lunch_mobile"))
     
     # Dinner and Other in next row for better mobile stack
     col3, col4 = st.columns(2)
     with col3:
         st.markdown("### 🍽️ Dinner")
-        dinner_amt = get_existing_amount("Dinner")
+        dinner_amt = get_existing_amount(day, "Dinner")
         if dinner_amt is not None:
             col_e, col_del_e = st.columns([3, 1])
             with col_e:
                 st.info(f"₹{dinner_amt:.2f}")
             with col_del_e:
-                if st.button("🗑️ Delete", key="del_dinner"):
-                    delete_entry("Dinner")
+                st.button("🗑️ Delete", key="del_dinner", on_click=delete_entry, args=(selected_date, "Dinner"))
         else:
-            dinner_input = st.text_input("", placeholder="e.g., 60.00", key="dinner_mobile")
-            try:
-                parsed_dinner = float(dinner_input) if dinner_input.strip() != "" else 0.0
-            except ValueError:
-                parsed_dinner = 0.0
-                if dinner_input.strip() != "":
+            with st.form(key="form_dinner"):
+                dinner_input = st.text_input("", placeholder="e.g., 60.00", key="dinner_mobile")
+                if parse_amount(dinner_input) is None:
                     st.error("Enter a valid number (e.g., 60.00)")
-            if st.button("💾 Save Dinner", key="save_dinner"):
-                save_entry("Dinner", parsed_dinner)
+                st.form_submit_button("💾 Save Dinner", key="save_dinner", on_click=save_entry_cb, args=(selected_date, "Dinner", "dinner_mobile"))
     
     with col4:
         st.markdown("### 🍟 Other")
-        other_amt = get_existing_amount("Other")
+        other_amt = get_existing_amount(day, "Other")
         if other_amt is not None:
             col_o, col_del_o = st.columns([3, 1])
             with col_o:
                 st.info(f"₹{other_amt:.2f}")
             with col_del_o:
-                if st.button("🗑️ Delete", key="del_other"):
-                    delete_entry("Other")
+                st.button("🗑️ Delete", key="del_other", on_click=delete_entry, args=(selected_date, "Other"))
         else:
-            other_input = st.text_input("", placeholder="e.g., 20.00", key="other_mobile")
-            other_desc = st.text_input("Quick note (e.g., 'snack')", max_chars=20, key="desc_mobile")
-            try:
-                parsed_other = float(other_input) if other_input.strip() != "" else 0.0
-            except ValueError:
-                parsed_other = 0.0
-                if other_input.strip() != "":
+            with st.form(key="form_other"):
+                other_input = st.text_input("", placeholder="e.g., 20.00", key="other_mobile")
+                st.text_input("Quick note (e.g., 'snack')", max_chars=20, key="desc_mobile")
+                if parse_amount(other_input) is None:
                     st.error("Enter a valid number (e.g., 20.00)")
-            if st.button("💾 Save Other", key="save_other"):
-                save_entry("Other", parsed_other, other_desc)
+                st.form_submit_button("💾 Save Other", key="save_other", on_click=save_entry_cb, args=(selected_date, "Other", "other_mobile", "desc_mobile"))
     
     # Clear All Button
-    if st.button("🗑️ Clear All Today's Entries", type="secondary"):
-        conn = sqlite3.connect('food_expenses.db')
-        conn.execute("DELETE FROM expenses WHERE date = ?", (selected_date,))
-        conn.commit()
-        conn.close()
+    if st.button("🗑️ Clear All Today's Entries", type="secondary", on_click=clear_day_cb, args=(selected_date,)):
         st.success("All cleared! Start fresh. 🔄")
-        st.rerun()
     
-    # Get daily total from DB
-    conn = sqlite3.connect('food_expenses.db')
-    df_today = pd.read_sql_query(
-        "SELECT amount FROM expenses WHERE date = ?",
-        conn, params=(selected_date,)
-    )
-    conn.close()
-    daily_total = df_today['amount'].sum() if not df_today.empty else 0.0
+    # Daily total from the loaded day
+    daily_total = sum(amount for _, amount in day.values())
     st.markdown(f"### **Daily Total: ₹{daily_total:.2f}**")
     
     # Responsive feedback based on total
@@ -217,15 +335,9 @@ if page == "Daily Entry":
     
     # View all today's entries (compact table)
     st.subheader("📋 Today's Entries")
-    conn = sqlite3.connect('food_expenses.db')
-    df_entries = pd.read_sql_query(
-        "SELECT meal, amount FROM expenses WHERE date = ? ORDER BY meal",
-        conn, params=(selected_date,)
-    )
-    conn.close()
+    df_entries = pd.DataFrame(sorted(day.values()), columns=['meal', 'amount'])
     if not df_entries.empty:
-        df_entries['amount'] = df_entries['amount'].apply(lambda x: f"₹{x:.2f}")
-        st.dataframe(df_entries, use_container_width=True)
+        st.dataframe(df_entries.style.format({'amount': '₹{:.2f}'}), use_container_width=True)
     else:
         st.info("No entries yet—add some! 🌟")
 
@@ -233,105 +345,70 @@ elif page == "Monthly Summary":
     # Month selection (clearer label)
     today = date.today()
     selected_month = st.date_input("Select Month (pick 1st for full view!)", value=today.replace(day=1), key="month_mobile")
-    
-    # Calculate month range
     month_start = selected_month.replace(day=1)  # Ensure it's 1st
-    next_month = month_start + relativedelta(months=1)
-    month_end = next_month - timedelta(days=1)
     
-    # Fetch data
-    conn = sqlite3.connect('food_expenses.db')
-    df_month = pd.read_sql_query(
-        "SELECT date, meal, amount FROM expenses WHERE date BETWEEN ? AND ? ORDER BY date",
-        conn, params=(month_start, month_end)
-    )
-    conn.close()
+    # Fetch + aggregate (cached per month until the next write)
+    daily_totals_raw, meal_breakdown_raw_grouped, monthly_total = monthly_summary(month_start, current_db_version())
     
-    if not df_month.empty:
+    if not daily_totals_raw.empty:
         st.subheader(f"📊 Summary: {month_start.strftime('%B %Y')} 🌟")
         
-        # Daily totals (raw for calc, styled for display)
-        df_month['date'] = pd.to_datetime(df_month['date'])
-        daily_totals_raw = df_month.groupby('date')['amount'].sum().reset_index()
-        daily_totals_raw['date'] = daily_totals_raw['date'].dt.strftime('%Y-%m-%d')
-        daily_totals_raw.columns = ['Date', 'Total']
-        daily_totals_styled = daily_totals_raw.style.format({'Total': '₹{:.2f}'})
+        # Daily totals
+        daily_totals_styled = daily_totals_raw.style.format({'Date': '{:%Y-%m-%d}', 'Total': '₹{:.2f}'})
         st.subheader("Daily Breakdown 📈")
         st.dataframe(daily_totals_styled, use_container_width=True)
         
         # Monthly total
-        monthly_total = df_month['amount'].sum()
         st.markdown(f"### **Monthly Total: ₹{monthly_total:.2f}** 🎯")
         
-        # Meal breakdown (group all variants into 4 categories: Breakfast, Lunch, Dinner, Other)
-        def categorize_meal(meal):
-            meal_lower = str(meal).lower()
-            if any(word in meal_lower for word in ['breakfast', 'morning']):
-                return 'Breakfast'
-            elif any(word in meal_lower for word in ['lunch', 'afternoon']):
-                return 'Lunch'
-            elif any(word in meal_lower for word in ['dinner', 'evening']):
-                return 'Dinner'
-            else:
-                return 'Other'
-        
-        df_month['meal_group'] = df_month['meal'].apply(categorize_meal)
-        meal_breakdown_raw_grouped = df_month.groupby('meal_group')['amount'].sum().reset_index()
-        meal_breakdown_raw_grouped.columns = ['Meal', 'Total']
-        # Sort by total descending for better view
-        meal_breakdown_raw_grouped = meal_breakdown_raw_grouped.sort_values('Total', ascending=False).reset_index(drop=True)
+        # Meal breakdown
         meal_breakdown_styled = meal_breakdown_raw_grouped.style.format({'Total': '₹{:.2f}'})
         st.subheader("By Meal Type 🥗")
         st.dataframe(meal_breakdown_styled, use_container_width=True)
         
-        # Perfect bars with Plotly (use grouped raw DF)
-        fig = px.bar(meal_breakdown_raw_grouped, x='Meal', y='Total', title="Meal Breakdown",
-                     color='Meal', color_discrete_sequence=px.colors.qualitative.Set3,
-                     height=300,  # Balanced height
-                     hover_data={'Total': ':.2f'})  # Hover shows ₹ via custom text if needed
-        fig.update_traces(hovertemplate='<b>%{x}</b><br>₹%{y:.2f}<extra></extra>')  # Custom hover with ₹
-        fig.update_layout(xaxis_title="Meal", yaxis_title="Amount (₹)", showlegend=False)
-        fig.update_traces(marker_line_color='white', marker_line_width=1)  # Clean borders
-        st.plotly_chart(fig, use_container_width=True)
+        # Built-in bar chart for the 4 bars (no Plotly bundle to ship)
+        st.bar_chart(meal_breakdown_raw_grouped.set_index('Meal')['Total'], height=300)  # Balanced height
     else:
         st.info("No data yet—start entering daily! Or pick the right month's 1st day (e.g., 2025-09-01). 🚀")
     
     # Reset button in sidebar
-    if st.sidebar.button("🗑️ Clear All Data (Careful!)"):
-        conn = sqlite3.connect('food_expenses.db')
-        conn.execute("DELETE FROM expenses")
-        conn.commit()
-        conn.close()
+    if st.sidebar.button("🗑️ Clear All Data (Careful!)", on_click=clear_all_cb):
         st.sidebar.success("Cleared! 🔄")
-        st.rerun()
 
 elif page == "Debug DB":
     st.subheader("🔍 All Entries in DB (Newest First)")
-    conn = sqlite3.connect('food_expenses.db')
-    df_all = pd.read_sql_query(
-        "SELECT id, date, meal, amount FROM expenses ORDER BY date DESC, id DESC",
-        conn
-    )
-    conn.close()
-    if not df_all.empty:
-        df_all['amount'] = df_all['amount'].apply(lambda x: f"₹{x:.2f}")
-        st.dataframe(df_all, use_container_width=True)
+    conn = get_conn()
+    # Paged so the page stays fast as the table grows
+    page_size = 500
+    total_rows = conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    if total_rows > 0:
+        n_pages = (total_rows + page_size - 1) // page_size
+        page_no = st.number_input(f"Page (of {n_pages}, {page_size} rows each)", min_value=1, max_value=n_pages, value=1, step=1) if n_pages > 1 else 1
+        df_all = pd.read_sql_query(
+            "SELECT id, date, meal_type AS meal, description, amount FROM expenses ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            conn, params=(page_size, (page_no - 1) * page_size)
+        )
+        df_all['meal'] = df_all['meal'].map(MEAL_NAMES)
+        st.dataframe(df_all.style.format({'amount': '₹{:.2f}'}), use_container_width=True)
         st.info("💡 Look for September dates here. If missing, re-enter on this app (cloud/local match matters!).")
     else:
         st.warning("DB empty—no entries saved yet. Add some in Daily Entry!")
     
-    # Quick filter for September
+    # Quick filter for September (date range instead of LIKE so the date index is used)
     if st.checkbox("Filter to September Only"):
-        conn = sqlite3.connect('food_expenses.db')
-        df_sept = pd.read_sql_query(
-            "SELECT id, date, meal, amount FROM expenses WHERE date LIKE '2025-09%' ORDER BY date DESC, id DESC",
-            conn
-        )
-        conn.close()
-        if not df_sept.empty:
-            df_sept['amount'] = df_sept['amount'].apply(lambda x: f"₹{x:.2f}")
-            st.dataframe(df_sept, use_container_width=True)
-            st.success(f"September has {len(df_sept)} entries. Total: ₹{df_sept['amount'].str.replace('₹', '').str.replace(',', '').astype(float).sum():.2f}")
+        sept_range = ('2025-09-01', '2025-10-01')
+        sept_count, sept_total = conn.execute(
+            "SELECT COUNT(*), SUM(amount) FROM expenses WHERE date >= ? AND date < ?",
+            sept_range
+        ).fetchone()
+        if sept_count > 0:
+            df_sept = pd.read_sql_query(
+                "SELECT id, date, meal_type AS meal, description, amount FROM expenses WHERE date >= ? AND date < ? ORDER BY date DESC, id DESC LIMIT ?",
+                conn, params=(*sept_range, page_size)
+            )
+            df_sept['meal'] = df_sept['meal'].map(MEAL_NAMES)
+            st.dataframe(df_sept.style.format({'amount': '₹{:.2f}'}), use_container_width=True)
+            st.success(f"September has {sept_count} entries. Total: ₹{sept_total:.2f}")
         else:
             st.info("No September data—try entering a test entry for 2025-09-01.")
 